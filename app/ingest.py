@@ -1,58 +1,175 @@
 import io
+import os
+import hashlib
+import itertools
+import shutil
+import sqlite3
+import tempfile
 import zipfile
+from pathlib import Path
 import requests
 import frontmatter
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import torch
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from minsearch import Index
 
 
-def read_repo_data(repo_owner, repo_name):
-    """Download and extract markdown files from a GitHub repository."""
-    url = f'https://codeload.github.com/{repo_owner}/{repo_name}/zip/refs/heads/main'
-    resp = requests.get(url)
+# Archives up to this size stay in memory while downloading; larger ones spill to disk
+SPOOL_MAX_SIZE = 16 << 20
 
-    repository_data = []
+# Threads used to decompress and parse markdown files from the archive
+PARSE_WORKERS = 8
 
-    zf = zipfile.ZipFile(io.BytesIO(resp.content))
+# Docs encoded per streaming window, in multiples of batch_size; large enough
+# for SentenceTransformers to length-sort within a window
+STREAM_WINDOW_BATCHES = 16
 
-    for file_info in zf.infolist():
-        filename = file_info.filename.lower()
+# Weight of each metadata field's embedding relative to the chunk body
+FIELD_WEIGHTS = {'header': 0.25, 'filename': 0.25}
 
-        # Only process markdown files
-        if not (filename.endswith('.md') or filename.endswith('.mdx')):
-            continue
+# Embeddings cache keyed by sha256(text + model name); set to empty to disable
+# Resolved against the project root, like .env in main.py, so every entry
+# point (CLI, Streamlit, eval scripts) shares one cache
+EMBEDDING_CACHE_PATH = os.getenv(
+    'EMBEDDING_CACHE_PATH',
+    str(Path(__file__).parent.parent / '.embed_cache.sqlite')
+)
+
+def _env_positive_int(name, default):
+    """Read a positive integer from the environment, falling back to default."""
+    try:
+        value = int(os.getenv(name, ''))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+# Texts per encode() forward pass when embedding a whole chunk set at once;
+# SentenceTransformers length-sorts before batching, so large batches pad little
+EMBEDDING_BATCH_SIZE = _env_positive_int('EMBEDDING_BATCH_SIZE', 1024)
+
+# SentenceTransformer inference backend: 'torch', 'onnx' or 'openvino'
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+
+# Exported model file for the onnx/openvino backends, e.g. an int8 ONNX export
+EMBEDDING_MODEL_FILE = os.getenv('EMBEDDING_MODEL_FILE') or None
+
+# Compile the torch encoder with torch.compile on load (opt-in: first encodes
+# pay the compile time, later ones run fused kernels)
+EMBEDDING_COMPILE = os.getenv('EMBEDDING_COMPILE', '').lower() in ('1', 'true', 'yes')
+
+# Intra-op threads for CPU encoding; gains flatten out beyond ~8 cores.
+# Follows OMP_NUM_THREADS, the standard knob torch itself honours.
+TORCH_NUM_THREADS = _env_positive_int('OMP_NUM_THREADS', min(8, os.cpu_count() or 1))
+
+# Worker processes for large CPU encodes, each running TORCH_NUM_THREADS
+# threads; by default only hosts with cores left over after one worker use more
+EMBEDDING_PROCESSES = _env_positive_int(
+    'EMBEDDING_PROCESSES', max(1, (os.cpu_count() or 1) // TORCH_NUM_THREADS)
+)
+
+# Starting workers costs a model copy each; only worth it for large encodes
+MULTI_PROCESS_MIN_TEXTS = 5000
+
+
+def _configure_torch_threads():
+    """Size torch's CPU thread pools for transformer matmuls."""
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    # Encode worker processes read OMP_NUM_THREADS when their torch starts,
+    # so they don't each grab every core
+    os.environ.setdefault('OMP_NUM_THREADS', str(TORCH_NUM_THREADS))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # The inter-op pool can only be sized before torch first uses it
+        pass
+    torch.backends.mkldnn.enabled = True
+
+
+_configure_torch_threads()
+
+
+def _parse_markdown_entry(zf, file_info):
+    """Parse one markdown entry of the archive into a document dict."""
+    # Decode while reading instead of holding both the bytes and the str
+    with zf.open(file_info) as f_in:
+        post = frontmatter.load(io.TextIOWrapper(f_in, encoding='utf-8', errors='replace'))
+        data = post.to_dict()
+
+    # Extract just the filename without the repo folder prefix
+    _, filename_repo = file_info.filename.split('/', maxsplit=1)
+    data['filename'] = filename_repo
+    return data
+
+
+def get_repo_commit_sha(repo_owner, repo_name, ref='main'):
+    """Return the commit sha of ref on GitHub, or None if it can't be fetched."""
+    url = f'https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{ref}'
+    try:
+        # This media type returns just the sha instead of the full commit JSON
+        resp = requests.get(
+            url, headers={'Accept': 'application/vnd.github.sha'}, timeout=10
+        )
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"⚠️ Could not get latest commit of {repo_owner}/{repo_name}: {e}")
+        return None
+    return resp.text.strip()
+
+
+def read_repo_data(repo_owner, repo_name):
+    """Download and extract markdown files from a GitHub repository."""
+    url = f'https://codeload.github.com/{repo_owner}/{repo_name}/zip/refs/heads/main'
+
+    # Stream the archive to a spooled temp file (in memory up to
+    # SPOOL_MAX_SIZE, on disk beyond) instead of buffering it all in RAM
+    with requests.get(url, stream=True) as resp, \
+            tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as tmp:
+        resp.raw.decode_content = True
+        shutil.copyfileobj(resp.raw, tmp)
+        tmp.seek(0)
 
-        with zf.open(file_info) as f_in:
-            content = f_in.read()
-            post = frontmatter.loads(content)
-            data = post.to_dict()
+        with zipfile.ZipFile(tmp) as zf:
+            # Only process markdown files
+            md_infos = [
+                fi for fi in zf.infolist()
+                if fi.filename.lower().endswith(('.md', '.mdx'))
+            ]
 
-            # Extract just the filename without the repo folder prefix
-            _, filename_repo = file_info.filename.split('/', maxsplit=1)
-            data['filename'] = filename_repo
-            repository_data.append(data)
+            # zipfile releases the GIL while decompressing, so threads overlap
+            with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+                repository_data = list(
+                    executor.map(lambda fi: _parse_markdown_entry(zf, fi), md_infos)
+                )
 
-    zf.close()
     print(f"✅ Loaded {len(repository_data)} markdown files from {repo_owner}/{repo_name}")
     return repository_data
 
 
-def sliding_window(seq, size, step):
-    """Create overlapping chunks using sliding window."""
+def _window_bounds(n, size, step):
+    """Yield (start, end) offsets of overlapping windows over a length-n sequence."""
     if size <= 0 or step <= 0:
         raise ValueError("size and step must be positive")
 
-    n = len(seq)
-    result = []
-    for i in range(0, n, step):
-        batch = seq[i:i+size]
-        result.append({'start': i, 'content': batch})
-        if i + size > n:
+    for start in range(0, n, step):
+        end = min(start + size, n)
+        yield start, end
+        # Stop once a window reaches the end; any later window would be
+        # a suffix of this one
+        if end == n:
             break
 
-    return result
+
+def sliding_window(seq, size, step):
+    """Create overlapping chunks using sliding window."""
+    return [
+        {'start': start, 'end': end, 'content': seq[start:end]}
+        for start, end in _window_bounds(len(seq), size, step)
+    ]
 
 
 def chunk_documents(docs, size=2000, step=1000):
@@ -60,16 +177,21 @@ def chunk_documents(docs, size=2000, step=1000):
     chunks = []
 
     for doc in docs:
-        doc_copy = doc.copy()
-        doc_content = doc_copy.pop('content')
-        doc_chunks = sliding_window(doc_content, size=size, step=step)
+        parent_meta = {k: v for k, v in doc.items() if k != 'content'}
+        doc_chunks = sliding_window(doc['content'], size=size, step=step)
         for chunk in doc_chunks:
-            chunk.update(doc_copy)
+            chunk.update(parent_meta)
         chunks.extend(doc_chunks)
 
     return chunks
 
 
+@lru_cache(maxsize=8)
+def _header_pattern(level):
+    """Compiled regex capturing whole markdown header lines of the given level."""
+    return re.compile(rf'^(#{{{level}}} .+)$', re.MULTILINE)
+
+
 def split_markdown_by_level(text, level=2, include_content_before_first_header=True):
     """
     Split markdown text by headers at a specific level.
@@ -81,55 +203,34 @@ def split_markdown_by_level(text, level=2, include_content_before_first_header=T
     
     Returns: List of (header, content) tuples
     """
-    # Create regex pattern for the specified header level
-    header_pattern = r'^(#{' + str(level) + r'} )(.+)$'
-    pattern = re.compile(header_pattern, re.MULTILINE)
-    
-    # Find all header positions
-    matches = list(pattern.finditer(text))
+    # Single pass: [before, header1, body1, header2, body2, ...]
+    parts = _header_pattern(level).split(text)
     
-    if not matches:
+    if len(parts) == 1:
         # No headers found at this level
         return [('No Header', text.strip())] if text.strip() else []
     
     sections = []
     
     # Handle content before first header
-    first_match = matches[0]
-    if include_content_before_first_header and first_match.start() > 0:
-        before_content = text[:first_match.start()].strip()
-        if before_content:
-            sections.append(('Introduction', before_content))
+    before_content = parts[0].strip()
+    if include_content_before_first_header and before_content:
+        sections.append(('Introduction', before_content))
     
-    # Process each section
-    for i, match in enumerate(matches):
-        header_marker = match.group(1)  # e.g., "## "
-        header_text = match.group(2)    # e.g., "Installation"
-        full_header = header_marker + header_text
-        
-        # Determine the content for this section
-        if i < len(matches) - 1:
-            # Content is from after this header to before next header
-            next_match = matches[i + 1]
-            content = text[match.end():next_match.start()].strip()
-        else:
-            # Last section: content is from after header to end
-            content = text[match.end():].strip()
-        
-        sections.append((full_header, content))
+    # Process each section, e.g. ("## Installation", "body text")
+    for header, content in zip(parts[1::2], parts[2::2]):
+        sections.append((header, content.strip()))
     
     return sections
 
 
-def section_chunk_documents(docs, level=2):
-    """Apply section-based chunking to documents."""
-    all_chunks = []
-    
+def iter_section_chunks(docs, level=2):
+    """Yield section-based chunks one at a time, without building a list."""
     for doc_idx, doc in enumerate(docs):
-        doc_copy = doc.copy()
-        doc_content = doc_copy.pop('content')
+        # Metadata shared by every chunk of this doc, built once per doc
+        parent_meta = {k: v for k, v in doc.items() if k != 'content'}
         
-        sections = split_markdown_by_level(doc_content, level=level)
+        sections = split_markdown_by_level(doc['content'], level=level)
         
         for section_idx, (header, content) in enumerate(sections):
             if not content:
@@ -145,62 +246,340 @@ def section_chunk_documents(docs, level=2):
                 'has_header': header != 'No Header' and header != 'Introduction'
             }
             
-            chunk_with_metadata = doc_copy.copy()
-            chunk_with_metadata.update(chunk_info)
-            all_chunks.append(chunk_with_metadata)
+            # One dict per chunk; values are shared references, not copies
+            yield {**parent_meta, **chunk_info}
+
+
+def section_chunk_documents(docs, level=2):
+    """Apply section-based chunking to documents."""
+    all_chunks = list(iter_section_chunks(docs, level=level))
     
     print(f"✅ Created {len(all_chunks)} section-based chunks")
     return all_chunks
 
-def create_vector_index_from_docs(docs, model_name='all-MiniLM-L6-v2'):
+def _auto_device():
+    """Pick the GPU when available, otherwise fall back to CPU."""
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
+
+
+def load_embedding_model(model_name, backend=EMBEDDING_BACKEND, model_file=EMBEDDING_MODEL_FILE):
+    """
+    Load a SentenceTransformer on the best available device (FP16 on GPU).
+    
+    Models are cached per (model_name, backend, model_file), so repeated
+    calls share one instance instead of reloading weights from disk.
+    
+    Args:
+        model_name: SentenceTransformer model name
+        backend: 'torch', 'onnx' or 'openvino'; non-torch backends need
+            the matching optimum extra and fall back to torch without it
+        model_file: Optional exported model file for non-torch backends,
+            e.g. 'onnx/model_qint8_avx512_vnni.onnx'
+    
+    Returns:
+        Loaded SentenceTransformer
+    """
+    # Always pass every argument positionally so defaults and explicit
+    # values hit the same cache entry
+    return _load_embedding_model(model_name, backend, model_file)
+
+
+@lru_cache(maxsize=4)
+def _load_embedding_model(model_name, backend, model_file):
+    """Cached loader behind load_embedding_model."""
+    device = _auto_device()
+    
+    if backend != 'torch':
+        model_kwargs = {'file_name': model_file} if model_file else None
+        try:
+            model = SentenceTransformer(
+                model_name, device=device, backend=backend, model_kwargs=model_kwargs
+            )
+            model.embedding_variant = f"{backend}|{model_file or ''}|fp32"
+            return model
+        except ImportError as e:
+            print(f"⚠️ {backend} backend not available ({e}), falling back to torch")
+    
+    # Half precision halves weight/activation traffic and uses tensor cores;
+    # embeddings are cast back to float32 after encoding
+    model_kwargs = {'torch_dtype': torch.float16} if device == 'cuda' else None
+    model = SentenceTransformer(model_name, device=device, model_kwargs=model_kwargs)
+    model.embedding_variant = f"torch||{'fp16' if device == 'cuda' else 'fp32'}"
+    if EMBEDDING_COMPILE:
+        _compile_encoder(model)
+    return model
+
+
+def embedding_variant(embedding_model):
+    """
+    Backend, exported model file and precision a model encodes with, e.g.
+    'onnx|onnx/model_qint8_avx512_vnni.onnx|fp32'.
+    
+    Embeddings from different variants differ slightly, so the variant is
+    part of every cache key; models not built by load_embedding_model are
+    assumed to be plain float32 torch models.
+    """
+    return getattr(embedding_model, 'embedding_variant', None) or 'torch||fp32'
+
+
+def _compile_encoder(model):
+    """Swap in a compiled wrapper of the model's transformer, keeping the eager one if that fails."""
+    transformer = model[0]
+    # auto_model is a plain attribute in older SentenceTransformers and a
+    # read-only property over .model in newer ones
+    attr = 'model' if isinstance(getattr(type(transformer), 'auto_model', None), property) else 'auto_model'
+    original = getattr(transformer, attr)
+    try:
+        # dynamic=True: batch size and sequence length vary between calls.
+        # The wrapper shares the original's weights and forwards attribute access
+        setattr(transformer, attr, torch.compile(original, dynamic=True))
+        # Compilation is lazy; trigger it now so failures surface here
+        model.encode(["warm up"], convert_to_numpy=True)
+    except Exception as e:
+        setattr(transformer, attr, original)
+        print(f"⚠️ torch.compile unavailable ({e}), using the eager model")
+
+
+def quantize_int8(embeddings):
+    """
+    Quantize embeddings to int8 with a symmetric per-dimension scale.
+    
+    Args:
+        embeddings: (N, D) float matrix
+    
+    Returns:
+        Tuple of (codes, scale) where codes is an (N, D) int8 matrix and
+        scale is a (D,) float32 vector such that embeddings ~= codes * scale
+    """
+    scale = np.abs(embeddings).max(axis=0, initial=0.0) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.round(embeddings / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def int8_scores(codes, scale, query_embedding):
+    """Dot-product scores of a float query against int8 codes."""
+    # Fold the scale into the query so the int8 matrix is never dequantized
+    return np.einsum('nd,d->n', codes, query_embedding * scale)
+
+
+def _use_process_pool(embedding_model, texts):
+    """Whether texts are worth spreading over several CPU worker processes."""
+    return (
+        EMBEDDING_PROCESSES > 1
+        and len(texts) >= MULTI_PROCESS_MIN_TEXTS
+        and embedding_model.device.type == 'cpu'
+        and getattr(embedding_model, 'backend', 'torch') == 'torch'
+        # Compiled modules can't be shipped to worker processes
+        and not EMBEDDING_COMPILE
+    )
+
+
+def _encode(embedding_model, texts, batch_size):
+    """Encode texts into a contiguous (N, D) matrix of normalized float32 vectors."""
+    # One call per list so SentenceTransformers can batch similar-length
+    # texts together instead of one forward pass per text
+    encode_kwargs = dict(
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=len(texts) > batch_size,
+    )
+    
+    if _use_process_pool(embedding_model, texts):
+        # Workers inherit OMP_NUM_THREADS from _configure_torch_threads
+        pool = embedding_model.start_multi_process_pool(['cpu'] * EMBEDDING_PROCESSES)
+        try:
+            embeddings = embedding_model.encode(
+                texts,
+                pool=pool,
+                chunk_size=max(batch_size, len(texts) // (EMBEDDING_PROCESSES * 4)),
+                **encode_kwargs,
+            )
+        finally:
+            embedding_model.stop_multi_process_pool(pool)
+    else:
+        embeddings = embedding_model.encode(texts, **encode_kwargs)
+    
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _cache_key(text, model_name, variant):
+    """Content hash identifying the embedding of text under model_name and variant."""
+    return hashlib.sha256(f"{text}|{model_name}|{variant}".encode('utf-8')).hexdigest()
+
+
+def encode_texts(embedding_model, texts, model_name, batch_size=64,
+                 cache_path=EMBEDDING_CACHE_PATH):
+    """
+    Encode texts, reusing embeddings from the on-disk cache when possible.
+    
+    Args:
+        embedding_model: Loaded SentenceTransformer
+        texts: List of strings to encode
+        model_name: Model name, part of the cache key with embedding_variant
+        batch_size: Number of texts encoded per forward pass
+        cache_path: SQLite file holding cached embeddings (None disables caching)
+    
+    Returns:
+        (N, D) float32 matrix of normalized embeddings in the order of texts
+    """
+    if not cache_path or not texts:
+        # Encode each distinct text once and fan the rows back out
+        rows = {text: row for row, text in enumerate(dict.fromkeys(texts))}
+        embeddings = _encode(embedding_model, list(rows), batch_size)
+        if len(rows) == len(texts):
+            return embeddings
+        return embeddings[[rows[text] for text in texts]]
+    
+    variant = embedding_variant(embedding_model)
+    keys = [_cache_key(text, model_name, variant) for text in texts]
+    
+    conn = sqlite3.connect(cache_path)
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        
+        cached = {}
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(keys), 900):
+            batch = keys[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            cached.update(conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ))
+        
+        # Distinct missing texts, so repeated texts are encoded only once
+        missing = dict.fromkeys(
+            (key, text) for key, text in zip(keys, texts) if key not in cached
+        )
+        hits = sum(key in cached for key in keys)
+        print(f"💾 Embedding cache: {hits} hits, {len(missing)} distinct misses")
+        
+        if missing:
+            fresh = _encode(embedding_model, [text for _, text in missing], batch_size)
+            fresh_rows = {key: fresh[row].tobytes() for row, (key, _) in enumerate(missing)}
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    fresh_rows.items(),
+                )
+            cached.update(fresh_rows)
+    finally:
+        conn.close()
+    
+    return np.stack([np.frombuffer(cached[key], dtype=np.float32) for key in keys])
+
+
+def _add_field_embeddings(embeddings, docs, embedding_model, batch_size, model_name,
+                          cache_path=EMBEDDING_CACHE_PATH):
+    """
+    Mix header/filename embeddings into chunk embeddings in place.
+    
+    Each distinct field value is encoded once and added to every chunk that
+    carries it with the weight from FIELD_WEIGHTS; rows are re-normalized.
+    """
+    for field, weight in FIELD_WEIGHTS.items():
+        values = [doc.get(field) for doc in docs]
+        unique_values = list(dict.fromkeys(v for v in values if v))
+        if not unique_values:
+            continue
+        
+        field_embeddings = encode_texts(
+            embedding_model, unique_values, model_name, batch_size, cache_path
+        )
+        value_to_row = {value: row for row, value in enumerate(unique_values)}
+        rows = [i for i, value in enumerate(values) if value]
+        field_rows = [value_to_row[values[i]] for i in rows]
+        embeddings[rows] += weight * field_embeddings[field_rows]
+    
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings /= np.maximum(norms, 1e-12)
+
+
+def create_vector_index_from_docs(docs, model_name='all-MiniLM-L6-v2', batch_size=64,
+                                  cache_path=EMBEDDING_CACHE_PATH, backend=EMBEDDING_BACKEND,
+                                  model=None):
     """
     Create vector embeddings for documents.
     
     Args:
-        docs: List of documents
+        docs: List or iterable of documents (e.g. iter_section_chunks)
         model_name: SentenceTransformer model name
+        batch_size: Number of texts encoded per forward pass
+        cache_path: SQLite file caching embeddings by content hash (None disables)
+        backend: Inference backend, see load_embedding_model
+        model: Preloaded SentenceTransformer (default: load_embedding_model)
     
     Returns:
-        Tuple of (vector_index, embedding_model, docs_with_ids)
+        Tuple of (embeddings, id_to_row, embedding_model, docs_with_ids) where
+        embeddings is an (N, D) float32 matrix and id_to_row maps chunk_id to
+        its row in that matrix
     """
     print(f"🔄 Creating vector embeddings with {model_name}...")
     
     try:
-        # Load embedding model
-        embedding_model = SentenceTransformer(model_name)
+        # Load embedding model unless the caller already has one
+        embedding_model = model if model is not None else load_embedding_model(model_name, backend=backend)
+        
+        dim = embedding_model.get_sentence_embedding_dimension()
         
-        vector_index = {}
+        # Preallocate when the size is known; generators are collected per window
+        num_docs = len(docs) if hasattr(docs, '__len__') else None
+        embeddings = np.empty((num_docs, dim), dtype=np.float32) if num_docs is not None else None
+        blocks = []
+        
+        ids = []
         docs_with_ids = []
+        docs_iter = iter(docs)
+        window_size = batch_size * STREAM_WINDOW_BATCHES
         
-        for i, doc in enumerate(docs):
-            # Create unique ID
-            chunk_id = doc.get('chunk_id', f"doc_{i}")
-            doc_copy = doc.copy()
-            doc_copy['chunk_id'] = chunk_id
-            
-            # Combine text fields for embedding
-            text_parts = []
-            if 'chunk' in doc_copy:
-                text_parts.append(doc_copy['chunk'])
-            if 'header' in doc_copy:
-                text_parts.append(doc_copy['header'])
-            if 'filename' in doc_copy:
-                text_parts.append(doc_copy['filename'])
+        # Chunk -> text -> encoder in one pass over windows of docs, so each
+        # window's text is encoded while it is still hot in cache
+        while True:
+            window = list(itertools.islice(docs_iter, window_size))
+            if not window:
+                break
             
-            text_to_embed = " ".join(text_parts)
-            
-            # Generate embedding
-            embedding = embedding_model.encode(text_to_embed)
-            vector_index[chunk_id] = embedding
+            texts = []
+            for doc in window:
+                # Create unique ID
+                chunk_id = doc.get('chunk_id', f"doc_{len(ids)}")
+                doc_copy = doc.copy()
+                doc_copy['chunk_id'] = chunk_id
+                
+                ids.append(chunk_id)
+                texts.append(doc_copy.get('chunk', ''))
+                docs_with_ids.append(doc_copy)
             
-            docs_with_ids.append(doc_copy)
+            # Chunk bodies are encoded on their own; headers and filenames
+            # repeat across chunks and are mixed in below
+            block = encode_texts(embedding_model, texts, model_name, batch_size, cache_path)
+            if embeddings is not None:
+                embeddings[len(ids) - len(window):len(ids)] = block
+            else:
+                blocks.append(block)
+        
+        if embeddings is None:
+            embeddings = np.concatenate(blocks) if blocks else np.empty((0, dim), dtype=np.float32)
+        
+        if not ids:
+            print("✅ Created 0 vector embeddings")
+            return embeddings, {}, embedding_model, []
+        
+        # Each distinct header/filename is encoded once and mixed in
+        _add_field_embeddings(
+            embeddings, docs_with_ids, embedding_model, batch_size, model_name, cache_path
+        )
+        id_to_row = {chunk_id: row for row, chunk_id in enumerate(ids)}
         
-        print(f"✅ Created {len(vector_index)} vector embeddings")
-        return vector_index, embedding_model, docs_with_ids
+        print(f"✅ Created {len(ids)} vector embeddings")
+        return embeddings, id_to_row, embedding_model, docs_with_ids
         
     except Exception as e:
         print(f"❌ Failed to create vector index: {e}")
-        return {}, None, []
+        return np.empty((0, 0), dtype=np.float32), {}, None, []
 
 def index_data(
         repo_owner,
@@ -1,18 +1,49 @@
 import os
 import json
-import secrets
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from pydantic_core import PydanticSerializationError
 from pydantic_ai.messages import ModelMessagesTypeAdapter
 
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to the stdlib json module
+    orjson = None
+
 
 # Use environment variable or default to 'logs'
 LOG_DIR = Path(os.getenv('LOGS_DIRECTORY', 'logs'))
 LOG_DIR.mkdir(exist_ok=True)
 
 
+def _tail_lines(filepath: Path, n: int, block_size: int = 1 << 16) -> list:
+    """Last n non-empty lines of a file, read backwards from its end in blocks."""
+    with filepath.open("rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        data = b""
+        # One line more than needed, so the first kept line is complete
+        while end > 0 and data.count(b"\n") <= n:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    lines = data.splitlines()
+    if end > 0:
+        lines = lines[1:]  # partial first line
+    return [line.decode("utf-8", errors="replace") for line in lines if line.strip()][-n:]
+
+
+def _raw_json(data: bytes):
+    """Wrap already-serialized JSON so it can be embedded in a log entry."""
+    if orjson is not None and hasattr(orjson, 'Fragment'):
+        # Written out verbatim by orjson, no parse/re-serialize round trip
+        return orjson.Fragment(data)
+    return json.loads(data)
+
+
 class ConversationLogger:
     def __init__(self, log_dir: Optional[str] = None):
         """
@@ -27,6 +58,11 @@ class ConversationLogger:
             self.log_dir = LOG_DIR
         
         self.log_dir.mkdir(exist_ok=True)
+        
+        # Day's JSONL file, opened lazily on the first log
+        self._fp = None
+        self._fp_date = None
+        self._lock = threading.Lock()
     
     def _serializer(self, obj):
         """Custom JSON serializer for datetime objects."""
@@ -34,13 +70,25 @@ class ConversationLogger:
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
     
+    def _dumps(self, entry: Dict[str, Any]) -> bytes:
+        """Serialize an entry to one newline-terminated JSON line."""
+        if orjson is not None:
+            # orjson handles datetime and numpy natively in C
+            return orjson.dumps(
+                entry,
+                default=self._serializer,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+            )
+        return (json.dumps(entry, default=self._serializer) + "\n").encode("utf-8")
+    
     def create_log_entry(
         self, 
         agent, 
         messages, 
         query: str, 
         response: str,
-        source: str = "user"
+        source: str = "user",
+        timestamp: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a log entry from agent interaction.
@@ -51,6 +99,7 @@ class ConversationLogger:
             query: User query
             response: Agent response
             source: Source of the query
+            timestamp: ISO timestamp of the interaction (default: now)
         
         Returns:
             Dictionary log entry
@@ -61,15 +110,14 @@ class ConversationLogger:
             for ts in agent.toolsets:
                 tools.extend(ts.tools.keys())
         
-        # Convert messages to dict if they're model messages
-        dict_messages = None
+        # Serialize model messages straight to JSON bytes with pydantic-core
         try:
-            dict_messages = ModelMessagesTypeAdapter.dump_python(messages)
-        except:
+            dict_messages = _raw_json(ModelMessagesTypeAdapter.dump_json(messages))
+        except (PydanticSerializationError, TypeError):
             dict_messages = str(messages)
         
         return {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "agent_name": getattr(agent, 'name', 'unknown_agent'),
             "system_prompt": getattr(agent, '_instructions', ''),
             "model": getattr(getattr(agent, 'model', None), 'model_name', 'unknown'),
@@ -80,6 +128,36 @@ class ConversationLogger:
             "source": source
         }
     
+    def _log_path(self, now: datetime) -> Path:
+        """Path of the JSON-lines file holding the given day's logs."""
+        return self.log_dir / f"conversations_{now:%Y%m%d}.jsonl"
+    
+    def _append(self, entry: Dict[str, Any], now: datetime) -> Path:
+        """
+        Append one entry as a JSON line to the day's log file.
+        
+        The file stays open between calls and is rotated when the date
+        changes, so each log costs a single write instead of open+write+close.
+        """
+        line = self._dumps(entry)
+        
+        with self._lock:
+            if self._fp is None or self._fp_date != now.date():
+                self.close()
+                self._fp = self._log_path(now).open("ab", buffering=1 << 16)
+                self._fp_date = now.date()
+            
+            self._fp.write(line)
+            self._fp.flush()
+            return Path(self._fp.name)
+    
+    def close(self):
+        """Close the currently open log file, if any."""
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+            self._fp_date = None
+    
     def log_interaction(
         self,
         agent,
@@ -89,7 +167,7 @@ class ConversationLogger:
         source: str = "user"
     ) -> Path:
         """
-        Log an interaction to a JSON file.
+        Log an interaction as one line of the day's JSONL file.
         
         Args:
             agent: The agent instance
@@ -101,20 +179,10 @@ class ConversationLogger:
         Returns:
             Path to the log file
         """
-        # Create log entry
-        entry = self.create_log_entry(agent, messages, query, response, source)
-        
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        rand_hex = secrets.token_hex(3)
-        agent_name = entry.get('agent_name', 'agent').replace(' ', '_')
-        
-        filename = f"{agent_name}_{timestamp}_{rand_hex}.json"
-        filepath = self.log_dir / filename
-        
-        # Write to file
-        with filepath.open("w", encoding="utf-8") as f_out:
-            json.dump(entry, f_out, indent=2, default=self._serializer)
+        # One clock read for both the entry timestamp and the log file date
+        now = datetime.now()
+        entry = self.create_log_entry(agent, messages, query, response, source, now.isoformat())
+        filepath = self._append(entry, now)
         
         print(f"📝 Log saved to: {filepath}")
         return filepath
@@ -131,26 +199,25 @@ class ConversationLogger:
         Returns:
             Path to the log file
         """
+        now = datetime.now()
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "agent_name": agent_name,
             "query": query,
             "response": response
         }
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"simple_{agent_name}_{timestamp}.json"
-        filepath = self.log_dir / filename
-        
-        with filepath.open("w", encoding="utf-8") as f_out:
-            json.dump(entry, f_out, indent=2)
+        filepath = self._append(entry, now)
         
         print(f"📝 Simple log saved to: {filepath}")
         return filepath
     
     def get_recent_logs(self, limit: int = 10) -> list:
         """
-        Get recent log entries.
+        Get recent log entries, newest first.
+        
+        Only the tail of the newest JSONL files is read, so the cost grows
+        with limit rather than with the total number of logs.
         
         Args:
             limit: Maximum number of logs to return
@@ -158,22 +225,21 @@ class ConversationLogger:
         Returns:
             List of log entries
         """
-        try:
-            log_files = sorted(self.log_dir.glob("*.json"), 
-                             key=lambda x: x.stat().st_mtime, 
-                             reverse=True)
+        if self._fp is not None:
+            self._fp.flush()
+        
+        logs = []
+        for filepath in sorted(self.log_dir.glob("conversations_*.jsonl"), reverse=True):
+            if len(logs) >= limit:
+                break
             
-            logs = []
-            for filepath in log_files[:limit]:
+            for line in reversed(_tail_lines(filepath, limit - len(logs))):
                 try:
-                    with filepath.open("r", encoding="utf-8") as f_in:
-                        logs.append(json.load(f_in))
+                    logs.append(json.loads(line))
                 except json.JSONDecodeError:
                     continue
-            
-            return logs
-        except FileNotFoundError:
-            return []
+        
+        return logs[:limit]
 
 
 # Create default logger instance for convenience
@@ -9,7 +9,9 @@ This module ties together all components:
 """
 
 import asyncio
+import hashlib
 import os
+import pickle
 from pathlib import Path
 
 # Load environment variables from .env file
@@ -21,8 +23,11 @@ load_dotenv(dotenv_path=env_path)
 print(f"🔑 Loading .env from: {env_path}")
 print(f"🔑 API Key found: {'Yes' if os.getenv('OPENROUTER_API_KEY') else 'No'}")
 
-from .ingest import index_data, create_vector_index_from_docs
-from .search_tools import setup_vector_search
+from .ingest import (
+    index_data, create_vector_index_from_docs, get_repo_commit_sha, load_embedding_model,
+    embedding_variant,
+)
+from .search_tools import VECTOR_INDEX, setup_vector_search
 from .search_agent import init_agent
 from .logs import ConversationLogger
 
@@ -32,6 +37,23 @@ REPO_OWNER = "ilhamksyuriadi"
 REPO_NAME = "workout-recommendation"
 CHUNK_METHOD = "sections"  # Best method from notebook analysis
 CHUNK_LEVEL = 2  # Section level 2 was best in notebook
+EMBEDDING_MODEL = 'multi-qa-distilbert-cos-v1'  # Same as notebook
+
+# Built indexes are pickled here, one file per repo commit and index settings
+INDEX_CACHE_DIR = Path(os.getenv('INDEX_CACHE_DIR', Path(__file__).parent.parent / '.index_cache'))
+
+
+def _index_cache_path(repo_owner: str, repo_name: str, chunk_method: str, embedding_model):
+    """Cache file for the indexes of the repo's current commit, or None if unknown."""
+    sha = get_repo_commit_sha(repo_owner, repo_name)
+    if sha is None:
+        return None
+    # Backend, exported model file and precision change the vectors too
+    variant = hashlib.sha256(embedding_variant(embedding_model).encode('utf-8')).hexdigest()[:12]
+    return INDEX_CACHE_DIR / (
+        f"{repo_owner}_{repo_name}_{sha}_{chunk_method}{CHUNK_LEVEL}"
+        f"_{EMBEDDING_MODEL}_{variant}_{VECTOR_INDEX}.pkl"
+    )
 
 
 def setup_indexes(repo_owner: str = REPO_OWNER, 
@@ -45,7 +67,8 @@ def setup_indexes(repo_owner: str = REPO_OWNER,
         repo_owner: GitHub repository owner
         repo_name: GitHub repository name
         chunk_method: Chunking method ('sections', 'sliding_window', or 'none')
-        use_cache: Whether to use cached indexes (not implemented yet)
+        use_cache: Reuse indexes pickled for the repo's current commit, and
+            pickle freshly built ones
     
     Returns:
         Tuple of (text_index, vector_index, embedding_model, docs)
@@ -54,6 +77,23 @@ def setup_indexes(repo_owner: str = REPO_OWNER,
     print("SETTING UP INDEXES")
     print("="*60)
     
+    # The model itself isn't pickled; loading it is cheap next to re-embedding,
+    # and its backend and precision are part of the cache file name
+    embedding_model = load_embedding_model(EMBEDDING_MODEL)
+    
+    cache_path = (
+        _index_cache_path(repo_owner, repo_name, chunk_method, embedding_model) if use_cache else None
+    )
+    if cache_path is not None and cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable index cache {cache_path}: {e}")
+        else:
+            print(f"✅ Loaded {len(cached['docs'])} chunks from index cache {cache_path.name}")
+            return cached['text_index'], cached['vector_index'], embedding_model, cached['docs']
+    
     # Step 1: Index the data (text search)
     print(f"\n1. Indexing {repo_owner}/{repo_name}...")
     text_index, docs = index_data(
@@ -69,10 +109,26 @@ def setup_indexes(repo_owner: str = REPO_OWNER,
     print("\n2. Creating vector embeddings...")
     vector_index, embedding_model = setup_vector_search(
         chunks=docs,
-        model_name='multi-qa-distilbert-cos-v1'  # Same as notebook
+        model_name=EMBEDDING_MODEL,
+        embedding_model=embedding_model
     )
     print(f"✅ Vector index created")
     
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so an interrupted run leaves no partial cache
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {'text_index': text_index, 'vector_index': vector_index, 'docs': docs},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, cache_path)
+            print(f"💾 Saved indexes to {cache_path}")
+        except Exception as e:
+            print(f"⚠️ Could not cache indexes: {e}")
+    
     return text_index, vector_index, embedding_model, docs
 
 
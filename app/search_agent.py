@@ -1,4 +1,5 @@
 import os
+import logging
 from typing import Optional, List, Dict, Any
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIChatModel
@@ -8,6 +9,13 @@ from openai import AsyncOpenAI
 from .search_tools import SearchTool
 
 
+log = logging.getLogger(__name__)
+
+
+# Maximum characters of each search result passed back to the agent
+MAX_SNIPPET_CHARS = 400
+
+
 SYSTEM_PROMPT_TEMPLATE = """
 You are a helpful assistant that answers questions about documentation.
 
@@ -84,21 +92,30 @@ def init_agent(
             >>> results = search(query="installation", k=3)
             >>> print(f"Found {len(results)} installation-related sections")
         """
-        print(f"🔍 Searching for: '{query}'")
+        log.debug("Agent search for: %r", query)
         
         results = search_tool.search(query=query, k=k, method=method)
         
-        # Format results for the agent
+        # Format results for the agent, skipping repeated content (e.g.
+        # overlapping sliding-window chunks) so fewer tokens reach the LLM
         formatted = []
-        for i, r in enumerate(results, 1):
+        seen = set()
+        for r in results:
+            # Sliding-window and unchunked docs keep their text under 'content'
+            content = r.get('chunk') or r.get('content', '')
+            key = r.get('chunk_id') or content
+            if key in seen:
+                continue
+            seen.add(key)
+            
             formatted.append({
-                'number': i,
+                'number': len(formatted) + 1,
                 'section': r.get('header', 'No section'),
-                'content': r.get('chunk', '')[:400],  # Limit content length
+                'content': content[:MAX_SNIPPET_CHARS],
                 'file': r.get('filename', '').split('/')[-1]
             })
         
-        print(f"📊 Found {len(formatted)} results")
+        log.debug("Agent search returned %d results", len(formatted))
         return formatted
     
     # Format system prompt
@@ -1,14 +1,312 @@
-from typing import List, Dict, Any, Optional
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import List, Dict, Any, Optional, Union
 from minsearch import Index, VectorSearch
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .ingest import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MODEL_FILE,
+    EMBEDDING_CACHE_PATH,
+    encode_texts,
+    load_embedding_model,
+    quantize_int8,
+    int8_scores,
+)
+
+try:
+    import hnswlib
+except ImportError:  # optional, only needed for VECTOR_INDEX=hnsw
+    hnswlib = None
+
+try:
+    import faiss
+except ImportError:  # optional, only needed for VECTOR_INDEX=faiss
+    faiss = None
+
+# Query embeddings remembered per SearchTool (repeated queries skip the model)
+QUERY_CACHE_SIZE = 1024
+
+# Per-query messages go through logging (off unless configured) instead of
+# print, so search hot paths don't write to stdout on every call
+log = logging.getLogger(__name__)
+
+# Runs the text half of hybrid searches while the caller embeds the query;
+# both mostly run in C (sparse matmul, torch) with the GIL released
+_TEXT_SEARCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='text-search')
+
+# Characters of each chunk shown in formatted results
+PREVIEW_CHARS = 300
+
+# How hybrid_search merges text and vector results: 'balanced' interleaves
+# equal shares, 'rrf' ranks by Reciprocal Rank Fusion
+HYBRID_FUSION = os.getenv('HYBRID_FUSION', 'balanced')
+
+# RRF damping constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
+# Vector index built by setup_vector_search: 'flat' (float32), 'int8', 'fp16'
+# 'hnsw' (approximate, needs hnswlib) or 'faiss' (approximate, needs faiss-cpu)
+VECTOR_INDEX = os.getenv('VECTOR_INDEX', 'flat')
+
+
+class QuantizedVectorSearch:
+    """
+    Brute-force vector search over int8- or float16-quantized embeddings.
+    
+    Same fit/search interface as minsearch's VectorSearch, but the index
+    holds int8 codes plus a per-dimension scale (4x smaller than float32)
+    or float16 vectors (2x smaller).
+    """
+    
+    def __init__(self, dtype: str = 'int8'):
+        if dtype not in ('int8', 'float16'):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        self.dtype = dtype
+        self.codes = None
+        self.scale = None
+        self.docs = []
+    
+    def fit(self, vectors, payload):
+        """Quantize vectors and store them alongside their documents."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dtype == 'int8':
+            self.codes, self.scale = quantize_int8(vectors)
+        else:
+            self.codes = vectors.astype(np.float16)
+        self.docs = payload
+        return self
+    
+    def search(self, query_vector, num_results: int = 10) -> List[Dict[str, Any]]:
+        """Return the documents with the highest dot-product scores."""
+        if not self.docs:
+            return []
+        
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        if self.dtype == 'int8':
+            scores = int8_scores(self.codes, self.scale, query_vector)
+        else:
+            # Accumulate in float32; numpy has no fast float16 dot product
+            scores = np.einsum('nd,d->n', self.codes, query_vector, dtype=np.float32)
+        k = min(num_results, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.docs[i] for i in top]
+
+
+class HNSWVectorSearch:
+    """
+    Approximate nearest-neighbour search over an hnswlib HNSW graph.
+    
+    Same fit/search interface as minsearch's VectorSearch; queries walk the
+    graph instead of scoring every embedding, so cost grows ~log(n).
+    """
+    
+    def __init__(self, M: int = 16, ef_construction: int = 200, ef: int = 64):
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.index = None
+        self.docs = []
+    
+    def fit(self, vectors, payload):
+        """Build the graph over vectors; row i of vectors belongs to payload[i]."""
+        self.docs = payload
+        if not len(payload):
+            return self
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Embeddings are normalized, so inner product ranks like cosine
+        self.index = hnswlib.Index(space='ip', dim=vectors.shape[1])
+        self.index.init_index(
+            max_elements=len(vectors), ef_construction=self.ef_construction, M=self.M
+        )
+        self.index.add_items(vectors, np.arange(len(vectors)))
+        return self
+    
+    def search(self, query_vector, num_results: int = 10) -> List[Dict[str, Any]]:
+        """Return the documents nearest to query_vector, best first."""
+        if not self.docs:
+            return []
+        
+        k = min(num_results, len(self.docs))
+        # ef bounds the candidate list and must be at least k
+        self.index.set_ef(max(self.ef, k))
+        labels, _ = self.index.knn_query(np.asarray(query_vector, dtype=np.float32), k=k)
+        return [self.docs[i] for i in labels[0]]
+
+
+class FaissVectorSearch:
+    """
+    Approximate nearest-neighbour search over a FAISS index.
+    
+    Uses an HNSW graph over the raw vectors for small corpora and switches to
+    a 4-bit IVF-PQ FastScan index (SIMD lookup tables, a few bytes per vector)
+    once there are enough vectors to train it.
+    """
+    
+    # Below this many vectors IVF-PQ can't be trained well; HNSW is used instead
+    IVFPQ_MIN_VECTORS = 20000
+    
+    def __init__(self, hnsw_M: int = 32, pq_m: int = 16, nprobe: int = 16):
+        self.hnsw_M = hnsw_M
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.index = None
+        self.docs = []
+    
+    def fit(self, vectors, payload):
+        """Train (if needed) and fill the index; row i of vectors belongs to payload[i]."""
+        self.docs = payload
+        if not len(payload):
+            return self
+        
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        
+        # Embeddings are normalized, so inner product ranks like cosine
+        if n >= self.IVFPQ_MIN_VECTORS and dim % self.pq_m == 0:
+            nlist = int(np.sqrt(n))
+            quantizer = faiss.IndexFlatIP(dim)
+            self.index = faiss.IndexIVFPQFastScan(
+                quantizer, dim, nlist, self.pq_m, 4, faiss.METRIC_INNER_PRODUCT
+            )
+            self.index.train(vectors)
+            self.index.nprobe = self.nprobe
+        else:
+            self.index = faiss.IndexHNSWFlat(dim, self.hnsw_M, faiss.METRIC_INNER_PRODUCT)
+        
+        self.index.add(vectors)
+        return self
+    
+    def search(self, query_vector, num_results: int = 10) -> List[Dict[str, Any]]:
+        """Return the documents nearest to query_vector, best first."""
+        if not self.docs:
+            return []
+        
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        _, labels = self.index.search(query, min(num_results, len(self.docs)))
+        # FAISS pads with -1 when fewer neighbours were found
+        return [self.docs[i] for i in labels[0] if i >= 0]
+    
+    def __getstate__(self):
+        # FAISS indexes are SWIG objects; pickle their serialized bytes instead
+        state = self.__dict__.copy()
+        if self.index is not None:
+            state['index'] = faiss.serialize_index(self.index)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.index is not None:
+            self.index = faiss.deserialize_index(self.index)
+
+
+def _dedup_key(result: Dict[str, Any]) -> Union[str, bytes]:
+    """Identity of a result for deduplication: its chunk_id, else a content digest."""
+    key = result.get('_chunk_id')
+    if key is None:
+        # Hash the whole text; a prefix collides for chunks that share their
+        # opening text (e.g. overlapping sliding windows). Sliding-window and
+        # unchunked docs keep their text under 'content' rather than 'chunk'
+        text = result.get('chunk') or result.get('content', '')
+        key = result.get('chunk_id') or hashlib.blake2b(
+            text.encode('utf-8'), digest_size=16
+        ).digest()
+    return key
+
+
+def _preview(result: Dict[str, Any]) -> str:
+    """Truncated chunk content shown in formatted results."""
+    preview = result.get('_preview')
+    if preview is None:
+        content = result.get('chunk', '')
+        preview = content[:PREVIEW_CHARS] + "..." if len(content) > PREVIEW_CHARS else content
+    return preview
+
+
+def rrf_merge(result_lists: List[List[Dict[str, Any]]], sources: List[str], k: int,
+              rrf_k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with Reciprocal Rank Fusion.
+    
+    Each result scores sum(1 / (rrf_k + rank)) over the lists it appears in.
+    Results are mapped to int32 ids with parallel rank arrays, so scoring and
+    ranking are single numpy calls; only the top k are turned back into dicts.
+    
+    Args:
+        result_lists: Ranked result lists, best first
+        sources: Name of each list, stored in '_source' ('both' if in several)
+        k: Number of results to return
+        rrf_k: Damping constant
+    
+    Returns:
+        Up to k result copies, best first
+    """
+    id_of = {}
+    first = []  # (result, source) of each id's first occurrence
+    ids, ranks = [], []
+    for results, source in zip(result_lists, sources):
+        for rank, result in enumerate(results, 1):
+            key = _dedup_key(result)
+            idx = id_of.get(key)
+            if idx is None:
+                idx = id_of[key] = len(first)
+                first.append((result, source))
+            elif first[idx][1] != source:
+                first[idx] = (first[idx][0], 'both')
+            ids.append(idx)
+            ranks.append(rank)
+    
+    if not first:
+        return []
+    
+    scores = np.zeros(len(first), dtype=np.float32)
+    np.add.at(scores, np.asarray(ids, dtype=np.int32), 1.0 / (rrf_k + np.asarray(ranks, dtype=np.float32)))
+    # Stable sort so ties keep first-seen order (earlier lists win)
+    top = np.argsort(-scores, kind='stable')[:k]
+    return [{**first[i][0], '_source': first[i][1]} for i in top]
+
+
+def make_vector_index(index_type: str = VECTOR_INDEX):
+    """
+    Create an empty vector index of the given type.
+    
+    Args:
+        index_type: 'flat' (minsearch VectorSearch), 'int8', 'fp16', 'hnsw' or 'faiss'
+    
+    Returns:
+        Index exposing fit(vectors, payload) and search(query_vector, num_results)
+    """
+    if index_type == 'flat':
+        return VectorSearch()
+    if index_type == 'int8':
+        return QuantizedVectorSearch('int8')
+    if index_type == 'fp16':
+        return QuantizedVectorSearch('float16')
+    if index_type == 'hnsw':
+        if hnswlib is None:
+            raise ImportError("VECTOR_INDEX=hnsw requires hnswlib: pip install hnswlib")
+        return HNSWVectorSearch()
+    if index_type == 'faiss':
+        if faiss is None:
+            raise ImportError("VECTOR_INDEX=faiss requires faiss: pip install faiss-cpu")
+        return FaissVectorSearch()
+    raise ValueError(f"Unknown vector index type: {index_type}")
+
 
 class SearchTool:
     def __init__(
         self, 
         index: Index, 
-        vector_index: Optional[VectorSearch] = None,
+        vector_index: Optional[Union[VectorSearch, QuantizedVectorSearch]] = None,
         embedding_model: Optional[SentenceTransformer] = None,
     ):
         """
@@ -16,12 +314,61 @@ class SearchTool:
         
         Args:
             index: MinSearch text index
-            vector_index: VectorSearch object from minsearch
+            vector_index: VectorSearch from minsearch or a QuantizedVectorSearch
             embedding_model: SentenceTransformer model for embeddings
         """
         self.index = index
         self.vector_index = vector_index
         self.embedding_model = embedding_model
+        self._query_cache = OrderedDict()
+        # Tool calls may run on several threads (e.g. asyncio.to_thread)
+        self._query_cache_lock = threading.Lock()
+    
+    def _remember_query(self, query: str, embedding: np.ndarray):
+        """Add a query embedding to the LRU cache, evicting the oldest entry."""
+        with self._query_cache_lock:
+            self._query_cache[query] = embedding
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query, reusing the result for repeated queries.
+        """
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+            if embedding is not None:
+                self._query_cache.move_to_end(query)
+                return embedding
+        
+        # Normalized float32, like the indexed embeddings, so scores are cosines;
+        # encoded outside the lock so other queries aren't blocked on the model
+        embedding = self.embedding_model.encode(
+            query, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+        self._remember_query(query, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries in one forward pass and cache them, so later
+        vector/hybrid searches for these queries skip the model.
+        
+        Args:
+            queries: Query strings
+        
+        Returns:
+            (len(queries), D) float32 matrix of normalized embeddings
+        """
+        embeddings = self.embedding_model.encode(
+            list(queries),
+            batch_size=max(len(queries), 1),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32, copy=False)
+        for query, embedding in zip(queries, embeddings):
+            self._remember_query(query, embedding)
+        return embeddings
     
     def text_search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -34,24 +381,25 @@ class SearchTool:
         Perform vector-based search using SentenceTransformer.
         """
         if not self.embedding_model or not self.vector_index:
-            print("⚠️ Vector search not available (no embedding model or vector index)")
+            log.warning("Vector search not available (no embedding model or vector index)")
             return []
         
         try:
             # Generate embedding for the query
-            query_embedding = self.embedding_model.encode(query)
+            query_embedding = self._embed_query(query)
             
             # Use VectorSearch.search method
             results = self.vector_index.search(query_embedding, num_results=k)
             
-            print(f"🔍 Vector search found {len(results)} results")
+            log.debug("Vector search found %d results", len(results))
             return results
             
         except Exception as e:
-            print(f"❌ Vector search error: {e}")
+            log.error("Vector search error: %s", e)
             return []
     
-    def hybrid_search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+    def hybrid_search(self, query: str, k: int = 5,
+                      fusion: str = HYBRID_FUSION) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining text and vector results.
         Balanced approach: takes equal from both methods.
@@ -59,63 +407,55 @@ class SearchTool:
         Args:
             query: Search query
             k: Number of results to return
+            fusion: 'balanced' (interleave) or 'rrf' (Reciprocal Rank Fusion)
         """
-        # Get results from both methods
-        text_results = self.text_search(query, k=k*2)
+        # Get results from both methods, overlapping their latencies
+        text_future = _TEXT_SEARCH_POOL.submit(self.text_search, query, k*2)
         vector_results = self.vector_search(query, k=k*2)
+        text_results = text_future.result()
         
-        print(f"📊 Hybrid search: {len(text_results)} text, {len(vector_results)} vector results")
+        log.debug("Hybrid search: %d text, %d vector results", len(text_results), len(vector_results))
         
         # If no vector results, return text results
         if not vector_results:
             return text_results[:k]
         
+        if fusion == 'rrf':
+            return rrf_merge([text_results, vector_results], ['text', 'vector'], k)
+        
         # Calculate how many to take from each (balanced)
         from_each = (k + 1) // 2  # e.g., 3 for k=5, 2 for k=3
         
-        combined_results = []
-        seen_chunks = set()
+        # Dedup key of every result, computed once
+        text_ids = [_dedup_key(r) for r in text_results]
+        vector_ids = [_dedup_key(r) for r in vector_results]
         
-        # Function to add result with deduplication
-        def add_result(result, source):
-            chunk_id = result.get('chunk_id', '') or result.get('chunk', '')[:100]
-            if chunk_id not in seen_chunks:
-                seen_chunks.add(chunk_id)
-                result = result.copy()  # Avoid modifying original
-                result['_source'] = source
-                combined_results.append(result)
-                return True
-            return False
+        # chunk_id -> (result, source), in selection order
+        selected = {}
+        taken = {'text': 0, 'vector': 0}
         
         # Interleave: text, vector, text, vector...
-        text_added = 0
-        vector_added = 0
-        max_attempts = max(len(text_results), len(vector_results))
-        
-        for i in range(max_attempts):
-            # Try to add text result
-            if text_added < from_each and i < len(text_results):
-                if add_result(text_results[i], 'text'):
-                    text_added += 1
-            
-            # Try to add vector result
-            if vector_added < from_each and i < len(vector_results):
-                if add_result(vector_results[i], 'vector'):
-                    vector_added += 1
+        for pairs in zip_longest(zip(text_ids, text_results), zip(vector_ids, vector_results)):
+            for pair, source in zip(pairs, ('text', 'vector')):
+                if pair is None or taken[source] >= from_each or len(selected) >= k:
+                    continue
+                chunk_id, result = pair
+                if chunk_id not in selected:
+                    selected[chunk_id] = (result, source)
+                    taken[source] += 1
             
             # Stop if we have enough
-            if len(combined_results) >= k:
+            if len(selected) >= k:
                 break
         
         # If still need more, take best remaining
-        if len(combined_results) < k:
-            all_results = text_results + vector_results
-            for result in all_results:
-                if len(combined_results) >= k:
-                    break
-                add_result(result, 'mixed')
+        for chunk_id, result in zip(text_ids + vector_ids, text_results + vector_results):
+            if len(selected) >= k:
+                break
+            selected.setdefault(chunk_id, (result, 'mixed'))
         
-        return combined_results[:k]
+        # Copy only the rows returned, avoiding modifying the originals
+        return [{**result, '_source': source} for result, source in selected.values()]
     
     def search(self, query: str, k: int = 5, method: str = 'hybrid') -> List[Dict[str, Any]]:
         """
@@ -129,7 +469,7 @@ class SearchTool:
         Returns:
             List of search results
         """
-        print(f"🔍 Performing {method} search for: '{query}'")
+        log.debug("Performing %s search for: %r", method, query)
         
         if method == 'vector':
             return self.vector_search(query, k=k)
@@ -160,11 +500,10 @@ class SearchTool:
         for i, result in enumerate(results, 1):
             filename = result.get('filename', 'Unknown')
             header = result.get('header', 'No section')
-            content = result.get('chunk', '')
             chunk_type = result.get('chunk_type', '')
             
             # Truncate content for readability
-            content_preview = content[:300] + "..." if len(content) > 300 else content
+            content_preview = _preview(result)
             
             formatted.append(
                 f"\n--- Result {i} ({chunk_type}) ---\n"
@@ -174,53 +513,64 @@ class SearchTool:
             )
         
         result_str = "\n".join(formatted)
-        print(f"📊 Found {len(results)} results")
+        log.debug("Found %d results", len(results))
         return result_str
 
 
 # Helper function to setup vector search (matching notebook approach)
-def setup_vector_search(chunks: List[Dict[str, Any]], model_name: str = 'multi-qa-distilbert-cos-v1'):
+def setup_vector_search(chunks: List[Dict[str, Any]], model_name: str = 'multi-qa-distilbert-cos-v1',
+                        index_type: str = VECTOR_INDEX,
+                        cache_path: Optional[str] = EMBEDDING_CACHE_PATH,
+                        backend: str = EMBEDDING_BACKEND,
+                        model_file: Optional[str] = EMBEDDING_MODEL_FILE,
+                        embedding_model: Optional[Any] = None):
     """
     Setup vector search with embeddings - matches notebook implementation.
     
     Args:
         chunks: List of document chunks
         model_name: SentenceTransformer model name
+        index_type: Vector index to build, see make_vector_index
+        cache_path: SQLite embedding cache shared with ingest (None disables it)
+        backend: 'torch', 'onnx' or 'openvino' (ONNX Runtime is 2-4x faster on CPU)
+        model_file: Exported model file for onnx/openvino, e.g. an int8 export
+        embedding_model: Preloaded SentenceTransformer (default: load model_name)
     
     Returns:
         Tuple of (vector_index, embedding_model)
     """
-    from tqdm.auto import tqdm
+    # Load embedding model unless the caller already has one
+    if embedding_model is None:
+        print(f"Loading embedding model: {model_name}")
+        embedding_model = load_embedding_model(model_name, backend, model_file)
     
-    # Load embedding model
-    print(f"Loading embedding model: {model_name}")
-    embedding_model = SentenceTransformer(model_name)
+    # Embedding text is "<file basename> <header> <chunk>", skipping missing fields
+    texts = [
+        (os.path.basename(chunk['filename']) + " " if 'filename' in chunk else "")
+        + (chunk['header'] + " " if 'header' in chunk else "")
+        + chunk.get('chunk', '')
+        for chunk in chunks
+    ]
     
-    # Create embeddings for all chunks
-    print("Creating embeddings...")
-    embeddings = []
+    # Precompute the per-result fields search needs; the text index holds
+    # the same dicts, so text results get them too
+    for chunk in chunks:
+        chunk['_chunk_id'] = _dedup_key(chunk)
+        chunk['_preview'] = _preview(chunk)
     
-    for chunk in tqdm(chunks):
-        # Combine relevant fields for embedding
-        text = chunk.get('chunk', '')
-        
-        # Add header for context (if exists)
-        if 'header' in chunk:
-            text = chunk['header'] + " " + text
-        
-        # Optionally add filename for more context
-        if 'filename' in chunk:
-            # Extract just the filename, not full path
-            filename = chunk['filename'].split('/')[-1]
-            text = filename + " " + text
-            
-        v = embedding_model.encode(text)
-        embeddings.append(v)
+    # Unchanged chunks are served from the on-disk cache; the misses are
+    # encoded in one call so SentenceTransformers can length-sort and batch them
+    print("Creating embeddings...")
+    embeddings = encode_texts(
+        embedding_model, texts, model_name, EMBEDDING_BATCH_SIZE, cache_path
+    )
     
-    embeddings = np.array(embeddings)
+    # encode_texts returns normalized float32 rows; keep the index at half
+    # the size of float64 and let search score with plain dot products
+    assert embeddings.dtype == np.float32, embeddings.dtype
     
     # Create vector search index
-    vector_index = VectorSearch()
+    vector_index = make_vector_index(index_type)
     vector_index.fit(embeddings, chunks)
     
     print(f"✅ Vector search index created with {len(embeddings)} embeddings")
@@ -6,16 +6,17 @@ Run with: streamlit run app/streamlit_app.py
 
 import streamlit as st
 import asyncio
+import logging
 import os
 import sys
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.ingest import index_data
-from app.search_tools import setup_vector_search
+from app.main import setup_indexes
 from app.search_agent import init_agent
 from app.logs import ConversationLogger
 
@@ -32,6 +33,9 @@ st.set_page_config(
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# LOG_LEVEL=DEBUG shows per-query search details
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'WARNING').upper())
+
 
 # Initialize session state
 if 'initialized' not in st.session_state:
@@ -48,28 +52,18 @@ def initialize_agent(repo_owner: str, repo_name: str, use_openrouter: bool = Tru
     """Initialize the agent with the specified repository."""
     
     with st.spinner("🔄 Setting up indexes... This may take a few minutes on first run."):
-        # Create indexes
+        # Create indexes (loaded from the on-disk cache when the repo is unchanged)
         progress_text = st.empty()
         
-        progress_text.text("📥 Downloading repository...")
-        text_index, docs = index_data(
+        progress_text.text("📥 Indexing repository and creating vector embeddings...")
+        text_index, vector_index, embedding_model, docs = setup_indexes(
             repo_owner=repo_owner,
             repo_name=repo_name,
-            filter=None,
-            chunk_method='sections',
-            chunking_params={'level': 2}
+            chunk_method='sections'
         )
         
         progress_text.text(f"✅ Indexed {len(docs)} document chunks")
         
-        progress_text.text("🧠 Creating vector embeddings...")
-        vector_index, embedding_model = setup_vector_search(
-            chunks=docs,
-            model_name='multi-qa-distilbert-cos-v1'
-        )
-        
-        progress_text.text("✅ Vector index created")
-        
         progress_text.text("🤖 Initializing AI agent...")
         
         # Check API key
@@ -115,9 +109,25 @@ async def ask_question_async(agent, question: str, logger):
     return result.output
 
 
+@st.cache_resource
+def get_event_loop():
+    """
+    One event loop for the whole server, running in a background thread.
+    
+    Reusing it keeps the agent's HTTP connections (keep-alive to the model
+    API) open between questions instead of building a new loop per call.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="agent-event-loop").start()
+    return loop
+
+
 def ask_question(agent, question: str, logger):
     """Synchronous wrapper for asking questions."""
-    return asyncio.run(ask_question_async(agent, question, logger))
+    future = asyncio.run_coroutine_threadsafe(
+        ask_question_async(agent, question, logger), get_event_loop()
+    )
+    return future.result()
 
 
 # Sidebar
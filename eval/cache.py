@@ -0,0 +1,113 @@
+"""
+Semantic Cache for Evaluation Runs
+
+Stores each evaluated question with its embedding, answer and grading so that
+reruns over the same (or paraphrased) questions skip the agent and evaluator calls.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class EvalCache:
+    """On-disk cache of evaluation records, looked up by exact or similar question."""
+
+    def __init__(self, path: Path, threshold: float = 0.95):
+        """
+        Load the cache file if it exists
+
+        Args:
+            path: Pickle file holding the cache
+            threshold: Minimum cosine similarity for a paraphrase to count as a hit
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self.questions = []
+        self.records = []
+        self.embeddings = []  # normalized float32 vector per question, or None
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'rb') as f:
+                    data = pickle.load(f)
+                self.questions = data["questions"]
+                self.records = data["records"]
+                self.embeddings = data["embeddings"]
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable evaluation cache {self.path}: {e}")
+
+        # Exact matches skip the similarity search
+        self._index = {question: i for i, question in enumerate(self.questions)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, question: str,
+               embedding: Optional[np.ndarray] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Find the cached record for a question
+
+        Args:
+            question: The question to look up
+            embedding: Normalized question embedding, for paraphrase matches
+
+        Returns:
+            (matched question, cached record), or None on a miss; the matched
+            question differs from question on a paraphrase hit
+        """
+        i = self._index.get(question)
+        if i is not None:
+            return self.questions[i], self.records[i]
+
+        if embedding is None:
+            return None
+
+        rows = [i for i, e in enumerate(self.embeddings) if e is not None]
+        if not rows:
+            return None
+
+        # Embeddings are normalized, so dot products are cosine similarities
+        matrix = np.stack([self.embeddings[i] for i in rows])
+        similarities = matrix @ np.asarray(embedding, dtype=np.float32)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self.questions[rows[best]], self.records[rows[best]]
+        return None
+
+    def add(self, question: str, embedding: Optional[np.ndarray], record: Dict[str, Any]):
+        """
+        Store (or replace) the record for a question
+
+        Args:
+            question: The evaluated question
+            embedding: Normalized question embedding (None stores an exact-match-only entry)
+            record: Answer and grading to cache
+        """
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+
+        i = self._index.get(question)
+        if i is not None:
+            self.records[i] = record
+            self.embeddings[i] = embedding
+            return
+
+        self._index[question] = len(self.questions)
+        self.questions.append(question)
+        self.records.append(record)
+        self.embeddings.append(embedding)
+
+    def save(self):
+        """Write the cache to disk, replacing the previous file atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(
+                {"questions": self.questions, "records": self.records, "embeddings": self.embeddings},
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_path, self.path)
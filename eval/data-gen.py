@@ -7,6 +7,7 @@ It uses the search functionality to understand the documentation and generate re
 
 import json
 import asyncio
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 from pydantic import BaseModel
@@ -14,13 +15,19 @@ from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 from openai import AsyncOpenAI
-import os
 
 # Import the search function from the app
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 from app.main import setup_indexes, setup_agent
+from app.search_tools import SearchTool
+
+# Repeated runs in one process (e.g. from a notebook) reuse the built
+# indexes; the app itself calls setup_indexes directly so it sees new commits
+_shared_indexes = lru_cache(maxsize=1)(setup_indexes)
 
 class QuestionSet(BaseModel):
     questions: List[str]
@@ -78,19 +85,18 @@ async def generate_synthetic_questions(num_questions: int = 15) -> List[str]:
 
     # Setup the search infrastructure
     print("Setting up search indexes for question generation...")
-    text_index, vector_index, embedding_model, docs = setup_indexes()
+    text_index, vector_index, embedding_model, docs = _shared_indexes()
+
+    # One search tool for every lookup, so its query-embedding cache is shared
+    search_tool = SearchTool(
+        index=text_index,
+        vector_index=vector_index,
+        embedding_model=embedding_model
+    )
 
     # Create a search function
     def search_docs(query: str) -> list:
         """Search function for getting documentation context"""
-        from app.search_tools import SearchTool
-
-        search_tool = SearchTool(
-            index=text_index,
-            vector_index=vector_index,
-            embedding_model=embedding_model
-        )
-
         results = search_tool.search(query=query, k=3, method='hybrid')
 
         # Format results
@@ -104,17 +110,24 @@ async def generate_synthetic_questions(num_questions: int = 15) -> List[str]:
 
         return formatted
 
-    # Get some sample search results to understand the documentation
-    sample_queries = ["installation", "API", "dataset", "running", "configuration"]
-    search_results = {}
-
-    for query in sample_queries:
+    async def search_or_empty(query: str) -> list:
         try:
-            results = search_docs(query)
-            search_results[query] = results
+            return await asyncio.to_thread(search_docs, query)
         except Exception as e:
             print(f"Error searching for {query}: {e}")
-            search_results[query] = []
+            return []
+
+    # Get some sample search results to understand the documentation
+    sample_queries = ["installation", "API", "dataset", "running", "configuration"]
+
+    # Embed all sample queries in one forward pass; the searches below then
+    # hit the query cache and only the text/vector lookups run concurrently
+    if embedding_model is not None:
+        search_tool.embed_queries(sample_queries)
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = {query: tg.create_task(search_or_empty(query)) for query in sample_queries}
+    search_results = {query: task.result() for query, task in tasks.items()}
 
     # Create context from search results
     context = "Documentation Overview:\n"
@@ -7,27 +7,81 @@ using synthetic questions and various evaluation criteria.
 
 import json
 import asyncio
+from functools import lru_cache
+import argparse
+import hashlib
+import importlib.util
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from time import perf_counter_ns
 from typing import List, Dict, Any
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, ConfigDict
 from pydantic_ai import Agent
+from pydantic_ai.exceptions import UnexpectedModelBehavior
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 from openai import AsyncOpenAI
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to the stdlib json module
+    orjson = None
 
 # Import the main agent and setup functions
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 from app.main import setup_indexes, setup_agent
+from app.search_agent import SYSTEM_PROMPT_TEMPLATE
+from cache import EvalCache
+
+# Repeated runs in one process (e.g. from a notebook) reuse the built
+# indexes; the app itself calls setup_indexes directly so it sees new commits
+_shared_indexes = lru_cache(maxsize=1)(setup_indexes)
 
 # Setup logging
 LOG_DIR = Path('../logs')
 LOG_DIR.mkdir(exist_ok=True)
 
+# Answers and gradings of previous runs, looked up by (similar) question.
+# One file per agent/judge/index configuration, see _eval_cache_path
+EVAL_CACHE_DIR = LOG_DIR
+
+# Agent calls, and separately grading calls, in flight at once; bounded to
+# stay within the provider's rate limits
+EVAL_CONCURRENCY = int(os.getenv('EVAL_CONCURRENCY', '8'))
+
+# Question/answer pairs graded per evaluator call, and how long a partial
+# batch waits for more answers before it is sent anyway
+EVAL_BATCH_SIZE = int(os.getenv('EVAL_BATCH_SIZE', '8'))
+EVAL_BATCH_WAIT = 1.0  # seconds
+
+def _dump_json(data: Dict[str, Any]) -> bytes:
+    """Serialize data as indented JSON, emitting datetimes in ISO 8601."""
+    if orjson is not None:
+        # orjson handles datetime and numpy natively in C
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, indent=2, default=lambda o: o.isoformat()).encode("utf-8")
+
+def _load_json(path: Path) -> Any:
+    """Read and parse a JSON file."""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dump_json_line(entry: Dict[str, Any]) -> bytes:
+    """Serialize an entry to one newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, default=lambda o: o.isoformat()) + "\n").encode("utf-8")
+
 class EvaluationResult(BaseModel):
     """Schema for evaluation results"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     instructions_follow: int  # 0-1: Did agent follow instructions?
     instructions_avoid: int   # 0-1: Did agent avoid forbidden actions?
     answer_relevant: int      # 0-1: Is answer relevant to question?
@@ -38,6 +92,8 @@ class EvaluationResult(BaseModel):
 
 class EvaluationCriteria(BaseModel):
     """Detailed evaluation criteria"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     instructions_follow: bool
     instructions_avoid: bool
     answer_relevant: bool
@@ -48,27 +104,47 @@ class EvaluationCriteria(BaseModel):
     overall_score: int  # 1-5
     reasoning: str
 
-# Setup evaluation model (same as main agent)
+class EvalBatch(BaseModel):
+    """Gradings for a batch of question/answer pairs, in prompt order"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    items: List[EvaluationCriteria]
+
+# Judge model; the grading is binary per criterion, so a small model is
+# enough. Any OpenAI-compatible endpoint works, e.g. a local Ollama judge:
+#   EVAL_BASE_URL=http://localhost:11434/v1 EVAL_MODEL=qwen2.5:7b-instruct
+EVAL_MODEL = os.getenv("EVAL_MODEL", "google/gemma-3-27b-it:free")
+EVAL_BASE_URL = os.getenv("EVAL_BASE_URL", "https://openrouter.ai/api/v1")
+
+# One connection pool for every grading call, sized for the concurrent
+# batches; HTTP/2 (when h2 is installed) multiplexes them over one connection
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    http2=importlib.util.find_spec("h2") is not None,
+    transport=httpx.AsyncHTTPTransport(retries=2),
+    timeout=120.0,
+)
+
+# Setup evaluation model (same provider as main agent by default)
 client = AsyncOpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),  # Add your API key
+    base_url=EVAL_BASE_URL,
+    # Local servers ignore the key but the client requires one
+    api_key=os.getenv("EVAL_API_KEY") or os.getenv("OPENROUTER_API_KEY") or "unused",
+    http_client=http_client,
 )
 
 provider = OpenAIProvider(openai_client=client)
 
 eval_model = OpenAIChatModel(
-    model_name="google/gemma-3-27b-it:free",
+    model_name=EVAL_MODEL,
     provider=provider
 )
 
-# Evaluation agent
-evaluation_agent = Agent(
-    name='evaluation_agent',
-    model=eval_model,
-    instructions="""
+EVALUATION_INSTRUCTIONS = """
     You are an expert evaluator of AI agent responses.
 
-    Evaluate the agent's response based on these criteria:
+    You receive one or more numbered pairs of a user question and the agent's
+    response. Evaluate each response based on these criteria:
 
     instructions_follow: The agent followed the user's instructions
     instructions_avoid: The agent avoided doing things it was told not to do
@@ -82,59 +158,185 @@ evaluation_agent = Agent(
 
     Also provide an overall score from 1-5 and brief reasoning.
 
+    Return one item per pair, in the same order as the pairs.
+
     The agent should use the search_workout_docs tool when answering questions about the repository.
-    """,
-    output_type=EvaluationCriteria
+    """
+
+# Evaluation agent
+evaluation_agent = Agent(
+    name='evaluation_agent',
+    model=eval_model,
+    instructions=EVALUATION_INSTRUCTIONS,
+    output_type=EvalBatch
 )
 
-async def evaluate_single_response(question: str, answer: str, tool_used: bool) -> Dict[str, Any]:
+def _eval_cache_path(agent, docs: List[Dict[str, Any]]) -> Path:
     """
-    Evaluate a single question-answer pair
+    Cache file for the current configuration, so changing the agent model,
+    its prompt, the indexed docs or the judge never reuses stale results
 
     Args:
-        question: The user's question
-        answer: The agent's response
-        tool_used: Whether the search tool was actually used
+        agent: The agent under evaluation
+        docs: The indexed chunks the agent searches
+    """
+    h = hashlib.sha256()
+    for part in (
+        getattr(getattr(agent, 'model', None), 'model_name', 'unknown'),
+        SYSTEM_PROMPT_TEMPLATE,
+        EVAL_MODEL,
+        EVAL_BASE_URL,
+        EVALUATION_INSTRUCTIONS,
+    ):
+        h.update(str(part).encode('utf-8') + b'\0')
+    for doc in docs:
+        h.update((doc.get('chunk') or doc.get('content', '')).encode('utf-8') + b'\0')
+    return EVAL_CACHE_DIR / f"eval_cache_{h.hexdigest()[:16]}.pkl"
+
+async def evaluate_responses(pairs: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Evaluate several question-answer pairs with one evaluator call
+
+    Args:
+        pairs: (question, answer, tool_used) tuples, where tool_used tells
+            whether the search tool was actually used
 
     Returns:
-        Dictionary with evaluation results
+        Dictionary with evaluation results for each pair, in order
     """
 
-    eval_prompt = f"""
+    eval_prompt = "\n".join(f"""
+    Pair {n}:
     Question: {question}
 
     Agent Response: {answer}
 
     Tool Used (actual): {tool_used}
+    """ for n, (question, answer, tool_used) in enumerate(pairs, 1))
+    eval_prompt += "\n    Evaluate the agent's performance on the given criteria for each pair.\n"
+
+    eval_result = await evaluation_agent.run(eval_prompt)
+
+    items = eval_result.output.items
+    if len(items) != len(pairs):
+        raise ValueError(f"Evaluator graded {len(items)} of {len(pairs)} responses")
+
+    results = []
+    for (question, answer, tool_used), criteria in zip(pairs, items):
+        # One model_dump instead of reading each field; keeps the field order
+        evaluation = criteria.model_dump()
+        evaluation["tool_call_search"] = tool_used  # Use actual tool usage instead of AI's guess
 
-    Evaluate the agent's performance on the given criteria.
+        results.append({
+            "question": question,
+            "tool_used_actual": tool_used,
+            "evaluation": evaluation
+        })
+    return results
+
+async def evaluate_single_response(question: str, answer: str, tool_used: bool) -> Dict[str, Any]:
     """
+    Evaluate a single question-answer pair
 
-    eval_result = await evaluation_agent.run(eval_prompt)
+    Args:
+        question: The user's question
+        answer: The agent's response
+        tool_used: Whether the search tool was actually used
 
-    return {
-        "question": question,
-        "answer_preview": answer[:200] + "..." if len(answer) > 200 else answer,
-        "tool_used_actual": tool_used,
-        "evaluation": {
-            "instructions_follow": eval_result.output.instructions_follow,
-            "instructions_avoid": eval_result.output.instructions_avoid,
-            "answer_relevant": eval_result.output.answer_relevant,
-            "answer_clear": eval_result.output.answer_clear,
-            "answer_citations": eval_result.output.answer_citations,
-            "completeness": eval_result.output.completeness,
-            "tool_call_search": tool_used,  # Use actual tool usage instead of AI's guess
-            "overall_score": eval_result.output.overall_score,
-            "reasoning": eval_result.output.reasoning
-        }
-    }
+    Returns:
+        Dictionary with evaluation results
+    """
+    return (await evaluate_responses([(question, answer, tool_used)]))[0]
 
-async def run_evaluation(questions: List[str]) -> Dict[str, Any]:
+class EvalBatcher:
+    """
+    Collects answers from concurrent questions and grades them in batches,
+    so N answers cost about N / batch_size evaluator calls
+    """
+
+    def __init__(self, batch_size: int, semaphore: asyncio.Semaphore,
+                 wait: float = EVAL_BATCH_WAIT):
+        """
+        Args:
+            batch_size: Pairs per evaluator call
+            semaphore: Limits evaluator calls in flight
+            wait: Seconds a partial batch waits for more pairs
+        """
+        self.batch_size = max(batch_size, 1)
+        self.semaphore = semaphore
+        self.wait = wait
+        self._pending = []
+        self._timer = None
+        self._tasks = set()  # keeps running batches from being garbage collected
+
+    async def grade(self, question: str, answer: str, tool_used: bool) -> Dict[str, Any]:
+        """Queue one pair for grading and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((question, answer, tool_used), future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._start(batch)
+
+    def _start(self, batch: List[tuple]):
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        pairs = [pair for pair, _ in batch]
+        try:
+            async with self.semaphore:
+                results = await evaluate_responses(pairs)
+        except (ValueError, UnexpectedModelBehavior) as e:
+            # A miscounted or invalid reply (ValidationError is a ValueError)
+            # shouldn't fail every question in the batch; grade its pairs one
+            # by one instead
+            if len(batch) > 1:
+                print(f"   Batch grading failed ({e}), grading {len(batch)} responses separately")
+                for item in batch:
+                    self._start([item])
+                return
+            self._fail(batch, e)
+            return
+        except Exception as e:
+            # Rate limits, auth and network errors: retrying per pair would
+            # only multiply requests, so every question in the batch fails
+            self._fail(batch, e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch: List[tuple], error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+async def run_evaluation(questions: List[str], use_cache: bool = True,
+                         force_regrade: bool = False) -> Dict[str, Any]:
     """
     Run full evaluation on a list of questions
 
     Args:
         questions: List of questions to evaluate
+        use_cache: Reuse answers and gradings of identical or near-identical
+            questions from previous runs, and cache new ones
+        force_regrade: With the cache, reuse cached answers but grade them again
 
     Returns:
         Complete evaluation results
@@ -142,103 +344,180 @@ async def run_evaluation(questions: List[str]) -> Dict[str, Any]:
 
     print(f"Starting evaluation of {len(questions)} questions...")
 
+    # Wall clock is read once; entry timestamps add the monotonic time elapsed
+    start_time = datetime.now()
+    start_ns = perf_counter_ns()
+
+    def _now() -> datetime:
+        return start_time + timedelta(microseconds=(perf_counter_ns() - start_ns) // 1000)
+
     # Setup the agent and indexes
     print("Setting up agent and indexes...")
-    text_index, vector_index, embedding_model, docs = setup_indexes()
+    text_index, vector_index, embedding_model, docs = _shared_indexes()
     agent, search_tool = setup_agent(text_index, vector_index, embedding_model)
 
-    evaluation_results = []
-    log_entries = []
-
-    for i, question in enumerate(questions, 1):
-        print(f"\n[{i}/{len(questions)}] Evaluating: {question[:60]}...")
+    cache = EvalCache(_eval_cache_path(agent, docs)) if use_cache else None
+    question_embeddings = [None] * len(questions)
+    if cache is not None:
+        print(f"Loaded evaluation cache with {len(cache)} entries")
+        if embedding_model is not None:
+            # One batch for all questions; used to match and store paraphrases
+            question_embeddings = embedding_model.encode(
+                questions, convert_to_numpy=True, normalize_embeddings=True
+            )
+
+    # Questions are independent, so their network round trips overlap.
+    # Answering and grading are limited separately: a question being graded
+    # frees its agent slot, so the next answer runs alongside the grading
+    agent_semaphore = asyncio.Semaphore(EVAL_CONCURRENCY)
+    eval_semaphore = asyncio.Semaphore(EVAL_CONCURRENCY)
+    grader = EvalBatcher(EVAL_BATCH_SIZE, eval_semaphore)
+
+    async def _eval_one(i: int, question: str):
+        """Answer and grade one question; returns (eval_result, log_entry or None)."""
+        embedding = question_embeddings[i - 1]
+        hit = cache.lookup(question, embedding) if cache is not None else None
+        matched_question, cached = hit if hit is not None else (None, None)
+
+        # Paraphrase hits reuse another question's answer; record which one
+        borrowed = {"matched_question": matched_question} if matched_question not in (None, question) else {}
+
+        if cached is not None and not force_regrade:
+            print(f"\n[{i}/{len(questions)}] Cached: {question[:60]}...")
+            eval_result = {**cached["eval_result"], "question": question, **borrowed, "cached": True}
+            log_entry = {
+                "timestamp": _now(),
+                "question": question,
+                **borrowed,
+                "answer": cached["answer"],
+                "tool_used": cached["tool_used"],
+                "evaluation": eval_result["evaluation"],
+                "agent_name": "workout_agent",
+                "cached": True
+            }
+            return eval_result, log_entry
 
         # Run the agent
         try:
-            result = await agent.run(user_prompt=question)
-
-            # Check if tool was actually used
-            tool_used = False
-            for msg in result.new_messages():
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    tool_used = True
-                    break
-
-            # Evaluate the response
-            eval_result = await evaluate_single_response(question, result.output, tool_used)
-            evaluation_results.append(eval_result)
+            if cached is not None:
+                # Regrading: reuse the cached answer, skip the agent call
+                print(f"\n[{i}/{len(questions)}] Regrading: {question[:60]}...")
+                answer, tool_used = cached["answer"], cached["tool_used"]
+            else:
+                async with agent_semaphore:
+                    print(f"\n[{i}/{len(questions)}] Evaluating: {question[:60]}...")
+                    result = await agent.run(user_prompt=question)
+                answer = result.output
+
+                # Check if tool was actually used; only model responses
+                # carry tool_calls, and any() stops at the first one
+                tool_used = any(getattr(msg, 'tool_calls', None) for msg in result.new_messages())
+
+            # Evaluate the response, batched with other finished answers
+            eval_result = {**await grader.grade(question, answer, tool_used), **borrowed}
+
+            if cache is not None:
+                cache.add(question, embedding, {
+                    "answer": answer,
+                    "tool_used": tool_used,
+                    "eval_result": eval_result
+                })
 
             # Create log entry
             log_entry = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now(),
                 "question": question,
-                "answer": result.output,
+                **borrowed,
+                "answer": answer,
                 "tool_used": tool_used,
                 "evaluation": eval_result["evaluation"],
                 "agent_name": "workout_agent"
             }
-            log_entries.append(log_entry)
 
-            print(f"   Score: {eval_result['evaluation']['overall_score']}/5")
-            print(f"   Tool used: {tool_used}")
+            print(f"   [{i}] Score: {eval_result['evaluation']['overall_score']}/5")
+            print(f"   [{i}] Tool used: {tool_used}")
+            return eval_result, log_entry
 
         except Exception as e:
-            print(f"   Error: {e}")
+            print(f"   [{i}] Error: {e}")
             # Add error entry
-            evaluation_results.append({
+            return {
                 "question": question,
                 "error": str(e),
                 "evaluation": None
-            })
+            }, None
+
+    # Detailed log: one JSON line per question, written as soon as it is
+    # graded, so an interrupted run keeps its finished results
+    timestamp = start_time.strftime("%Y%m%d_%H%M%S")
+    log_filepath = LOG_DIR / f"evaluation_log_{timestamp}.jsonl"
+    summary_filepath = LOG_DIR / f"evaluation_log_{timestamp}_summary.json"
+
+    with open(log_filepath, 'ab') as log_file:
+        async def _eval_and_log(i: int, question: str):
+            eval_result, log_entry = await _eval_one(i, question)
+            if log_entry is not None:
+                # Tasks share the file safely: the write doesn't await, so
+                # lines can't interleave within the event loop
+                log_file.write(_dump_json_line(log_entry))
+                log_file.flush()
+            return eval_result
+
+        # gather keeps results in question order
+        evaluation_results = await asyncio.gather(
+            *(_eval_and_log(i, question) for i, question in enumerate(questions, 1))
+        )
+
+    if cache is not None:
+        cache.save()
 
     # Calculate summary statistics
     valid_results = [r for r in evaluation_results if r.get("evaluation")]
 
     if valid_results:
-        avg_score = sum(r["evaluation"]["overall_score"] for r in valid_results) / len(valid_results)
-        tool_usage_rate = sum(1 for r in valid_results if r["tool_used_actual"]) / len(valid_results) * 100
-
-        criteria_avg = {}
         criteria_names = ["instructions_follow", "instructions_avoid", "answer_relevant",
                          "answer_clear", "answer_citations", "completeness", "tool_call_search"]
 
-        for criterion in criteria_names:
-            criteria_avg[criterion] = sum(r["evaluation"][criterion] for r in valid_results) / len(valid_results) * 100
+        # One pass builds a (questions, criteria) 0/1 matrix; the averages
+        # are then column means
+        criteria = np.array(
+            [[r["evaluation"][c] for c in criteria_names] for r in valid_results], dtype=np.int8
+        )
+        scores = np.fromiter((r["evaluation"]["overall_score"] for r in valid_results),
+                             dtype=np.float64, count=len(valid_results))
+        tools = np.fromiter((r["tool_used_actual"] for r in valid_results),
+                            dtype=np.bool_, count=len(valid_results))
 
         summary = {
             "total_questions": len(questions),
             "valid_evaluations": len(valid_results),
-            "average_score": round(avg_score, 2),
-            "tool_usage_rate": round(tool_usage_rate, 1),
-            "criteria_percentages": {k: round(v, 1) for k, v in criteria_avg.items()}
+            "average_score": round(float(scores.mean()), 2),
+            "tool_usage_rate": round(float(tools.mean()) * 100, 1),
+            "criteria_percentages": dict(zip(criteria_names, (criteria.mean(axis=0) * 100).round(1).tolist()))
         }
     else:
         summary = {"error": "No valid evaluations completed"}
 
-    # Save detailed log
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_filename = f"evaluation_log_{timestamp}.json"
-    log_filepath = LOG_DIR / log_filename
-
-    log_data = {
+    # Save summary next to the detailed log
+    summary_data = {
         "evaluation_summary": summary,
-        "individual_results": log_entries,
         "metadata": {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now(),
             "num_questions": len(questions),
-            "agent_name": "workout_agent"
+            "agent_name": "workout_agent",
+            "log_file": log_filepath.name
         }
     }
 
-    with open(log_filepath, 'w') as f:
-        json.dump(log_data, f, indent=2)
+    await asyncio.to_thread(summary_filepath.write_bytes, _dump_json(summary_data))
 
-    print(f"\nEvaluation complete! Results saved to {log_filename}")
+    print(f"\nEvaluation complete! Results saved to {log_filepath.name} and {summary_filepath.name}")
 
     return {
         "summary": summary,
         "results": evaluation_results,
-        "log_file": str(log_filepath)
+        "log_file": str(log_filepath),
+        "summary_file": str(summary_filepath)
     }
 
 async def load_synthetic_questions(filename: str = "synthetic_questions.json") -> List[str]:
@@ -263,23 +542,30 @@ async def load_synthetic_questions(filename: str = "synthetic_questions.json") -
             "What are the main features?"
         ]
 
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    # Blocking file I/O runs off the event loop
+    data = await asyncio.to_thread(_load_json, filepath)
 
     return data.get("questions", [])
 
-async def main():
+async def main(use_cache: bool = True, force_regrade: bool = False):
     """Main evaluation function"""
 
     print("DOCUMENTATION ASSISTANT EVALUATION")
     print("=" * 50)
 
-    # Load questions
-    questions = await load_synthetic_questions()
-    print(f"Loaded {len(questions)} questions for evaluation")
+    # The agent under test needs the key; fail before building the indexes
+    if not os.getenv("OPENROUTER_API_KEY"):
+        raise ValueError("OPENROUTER_API_KEY not found in environment variables")
+
+    try:
+        # Load questions
+        questions = await load_synthetic_questions()
+        print(f"Loaded {len(questions)} questions for evaluation")
 
-    # Run evaluation
-    results = await run_evaluation(questions)
+        # Run evaluation
+        results = await run_evaluation(questions, use_cache=use_cache, force_regrade=force_regrade)
+    finally:
+        await http_client.aclose()
 
     # Print summary
     print("\n" + "=" * 50)
@@ -301,4 +587,11 @@ async def main():
     print(f"\nDetailed results saved to: {results['log_file']}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Evaluate the documentation assistant agent")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and don't update the evaluation cache")
+    parser.add_argument("--force-regrade", action="store_true",
+                        help="Grade cached answers again instead of reusing their grading")
+    args = parser.parse_args()
+
+    asyncio.run(main(use_cache=not args.no_cache, force_regrade=args.force_regrade))
\ No newline at end of file
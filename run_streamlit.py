@@ -5,7 +5,7 @@ This script helps run the Streamlit app with the correct module path.
 Run with: uv run python run_streamlit.py
 """
 
-import subprocess
+import os
 import sys
 from pathlib import Path
 
@@ -19,9 +19,17 @@ print("The app will open in your browser automatically.")
 print("Press Ctrl+C to stop the server.")
 print("="*60 + "\n")
 
-# Run streamlit
-subprocess.run([
+# Run streamlit in place of this process so no idle launcher is left waiting
+command = [
     sys.executable, "-m", "streamlit", "run",
     str(app_path),
     "--server.headless", "false"
-])
+]
+
+if os.name == "nt":
+    # exec on Windows spawns a new process and exits, which breaks Ctrl+C
+    import subprocess
+    subprocess.run(command)
+else:
+    sys.stdout.flush()
+    os.execvp(sys.executable, command)
@@ -4,19 +4,84 @@ Run this from the project root directory.
 """
 
 import asyncio
+import os
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.ingest import index_data
-from app.search_tools import setup_vector_search
-from app.search_agent import init_agent
+MODEL_NAME = 'multi-qa-distilbert-cos-v1'
+
+# ST_CACHE keeps downloaded models in one place across test runs; once the
+# model is there, skip the Hugging Face Hub checks. Must be set before
+# sentence_transformers is imported.
+ST_CACHE = os.getenv("ST_CACHE")
+if ST_CACHE:
+    ST_CACHE = os.path.expanduser(ST_CACHE)
+    os.environ.setdefault("SENTENCE_TRANSFORMERS_HOME", ST_CACHE)
+    if any(Path(ST_CACHE).glob(f"*{MODEL_NAME}*")):
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+def test_offline_helpers():
+    """Test pure helpers that need no network or model download."""
+    # App modules pull in sentence_transformers; import them only when the
+    # tests run so importing this file stays cheap
+    from app.ingest import chunk_documents, sliding_window, quantize_int8, int8_scores
+    
+    print("\n" + "="*60)
+    print("TESTING OFFLINE HELPERS")
+    print("="*60)
+    
+    # Test: sliding window boundaries
+    print("\n[OFFLINE] Sliding Window")
+    print("-" * 40)
+    try:
+        windows = sliding_window('abcdefghij', 4, 2)
+        bounds = [(w['start'], w['end']) for w in windows]
+        assert bounds == [(0, 4), (2, 6), (4, 8), (6, 10)], f"Unexpected windows: {bounds}"
+        assert windows[-1]['content'] == 'ghij', "Last window should end at the end of the text"
+        
+        chunks = chunk_documents([{'content': 'abcdefghij', 'filename': 'a.md'}], size=4, step=2)
+        assert [(c['start'], c['end']) for c in chunks] == bounds, "chunk_documents disagrees"
+        assert all(c['filename'] == 'a.md' for c in chunks), "Metadata not copied to chunks"
+        print(f"✅ Sliding window produced {len(windows)} windows ending at 10")
+    except Exception as e:
+        print(f"❌ Sliding window check failed: {e}")
+        return False
+    
+    # Test: int8 quantization round trip
+    print("\n[OFFLINE] Int8 Quantization")
+    print("-" * 40)
+    try:
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((200, 384)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        query = embeddings[7]
+        
+        codes, scale = quantize_int8(embeddings)
+        assert codes.dtype == np.int8, f"Expected int8 codes, got {codes.dtype}"
+        scores = int8_scores(codes, scale, query)
+        max_error = float(np.abs(scores - embeddings @ query).max())
+        assert max_error < 0.01, f"Int8 score error too large: {max_error}"
+        assert int(np.argmax(scores)) == 7, "Query should be its own nearest neighbour"
+        print(f"✅ Int8 scores match float32 within {max_error:.5f}")
+    except Exception as e:
+        print(f"❌ Int8 quantization check failed: {e}")
+        return False
+    
+    return True
 
 
 async def test_basic_functionality():
     """Test basic functionality of the app."""
+    from app.ingest import index_data, create_vector_index_from_docs, load_embedding_model
+    from app.search_tools import setup_vector_search
+    from app.search_agent import init_agent
     
     print("\n" + "="*60)
     print("TESTING DOCUMENTATION Q&A AGENT")
@@ -50,15 +115,39 @@ async def test_basic_functionality():
     print("\n[TEST 2] Vector Search Setup")
     print("-" * 40)
     try:
+        # Loaded once and shared by every test below
+        shared_model = load_embedding_model(MODEL_NAME)
         vector_index, embedding_model = setup_vector_search(
             chunks=docs[:10],  # Use only 10 chunks for quick test
-            model_name='multi-qa-distilbert-cos-v1'
+            model_name=MODEL_NAME,
+            embedding_model=shared_model
         )
         print("✅ Vector search index created successfully")
     except Exception as e:
         print(f"❌ Vector search setup failed: {e}")
         return False
     
+    # Test 2b: Embedding matrix contract
+    print("\n[TEST 2b] Embedding Matrix")
+    print("-" * 40)
+    try:
+        embeddings, id_to_row, model, docs_with_ids = create_vector_index_from_docs(
+            docs[:10],
+            model_name=MODEL_NAME,
+            cache_path=None,
+            model=shared_model
+        )
+        assert model is not None, "Embedding model failed to load"
+        assert embeddings.dtype == np.float32, f"Expected float32, got {embeddings.dtype}"
+        assert embeddings.ndim == 2 and embeddings.shape[0] == len(docs_with_ids), \
+            f"Expected ({len(docs_with_ids)}, D) matrix, got {embeddings.shape}"
+        assert id_to_row == {d['chunk_id']: i for i, d in enumerate(docs_with_ids)}, \
+            "id_to_row does not match docs_with_ids"
+        print(f"✅ Embedding matrix has shape {embeddings.shape} and dtype float32")
+    except Exception as e:
+        print(f"❌ Embedding matrix check failed: {e}")
+        return False
+    
     # Test 3: Text search
     print("\n[TEST 3] Text Search")
     print("-" * 40)
@@ -75,11 +164,20 @@ async def test_basic_functionality():
     print("\n[TEST 4] Vector Search")
     print("-" * 40)
     try:
-        query_embedding = embedding_model.encode("how to install")
-        results = vector_index.search(query_embedding, num_results=3)
-        print(f"✅ Vector search returned {len(results)} results")
-        if results:
-            print(f"   First result: {results[0].get('header', 'No header')}")
+        # Encode all queries in one batch, normalized like the index rows
+        queries = ["how to install", "how to run the app"]
+        query_embeddings = embedding_model.encode(
+            queries,
+            batch_size=64,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+        for query, query_embedding in zip(queries, query_embeddings):
+            results = vector_index.search(query_embedding, num_results=3)
+            print(f"✅ Vector search for '{query}' returned {len(results)} results")
+            if results:
+                print(f"   First result: {results[0].get('header', 'No header')}")
     except Exception as e:
         print(f"❌ Vector search failed: {e}")
         return False
@@ -89,7 +187,6 @@ async def test_basic_functionality():
     print("-" * 40)
     try:
         # Check if API key is available
-        import os
         has_openrouter = bool(os.getenv("OPENROUTER_API_KEY"))
         has_openai = bool(os.getenv("OPENAI_API_KEY"))
         
@@ -124,5 +221,5 @@ async def test_basic_functionality():
 
 
 if __name__ == "__main__":
-    success = asyncio.run(test_basic_functionality())
+    success = test_offline_helpers() and asyncio.run(test_basic_functionality())
     sys.exit(0 if success else 1)